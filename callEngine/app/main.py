@@ -1,16 +1,34 @@
+import os
+import asyncio
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from app.routes import voice, call, calls, audio_management
 from app.database import connect_to_mongo, close_mongo_connection
+from app.utils.audio_gc import audio_gc_loop
+
+# Seconds between background audio GC runs (0 disables it)
+AUDIO_GC_INTERVAL = int(os.getenv("AUDIO_GC_INTERVAL", 6 * 60 * 60))
+# Periodic runs only log what they would remove unless this is enabled.
+# Scripts generated before generate-audio stored them in Mongo look orphaned,
+# so re-run generate-audio (or check a dry-run report) before turning it on.
+AUDIO_GC_DELETE = os.getenv("AUDIO_GC_DELETE", "false").lower() == "true"
 
 # 🟢 LIFESPAN context manager (Modern FastAPI)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    gc_task = None
+    if AUDIO_GC_INTERVAL > 0:
+        gc_task = asyncio.create_task(audio_gc_loop(AUDIO_GC_INTERVAL, delete=AUDIO_GC_DELETE))
     yield
     # Shutdown
+    if gc_task:
+        # Let a running GC batch finish unwinding before Mongo goes away
+        gc_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await gc_task
     await close_mongo_connection()
 
 app = FastAPI(lifespan=lifespan)
@@ -1,47 +1,94 @@
 import os
+import asyncio
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
+from app.utils.audio_cache import BASE_STATIC_DIR, audio_path, forget_versions, is_safe_name
+from app.utils.audio_gc import run_gc, DEFAULT_BATCH_SIZE, DEFAULT_MIN_AGE_SECONDS
 
 router = APIRouter()
 
 class DeleteAudioRequest(BaseModel):
     keys: List[str]
 
+def _delete_keys(slug: str, keys: List[str]):
+    """Blocking part of delete-audio, run on a worker thread"""
+    deleted_files = []
+    failed_files = []
+
+    for key in keys:
+        if not is_safe_name(key):
+            failed_files.append({"file": f"{key}.mp3", "error": "Invalid key"})
+            continue
+
+        try:
+            os.remove(audio_path(slug, key))
+            deleted_files.append(f"{key}.mp3")
+        except FileNotFoundError:
+            # File doesn't exist, not an error
+            pass
+        except Exception as e:
+            failed_files.append({"file": f"{key}.mp3", "error": str(e)})
+
+    forget_versions(slug, [file[:-len(".mp3")] for file in deleted_files])
+
+    return deleted_files, failed_files
+
 @router.post("/{slug}/delete-audio")
 async def delete_audio_files(slug: str, request: DeleteAudioRequest):
     """Delete audio files for removed questions"""
+    if not is_safe_name(slug):
+        raise HTTPException(status_code=400, detail="Invalid script slug")
+
     try:
-        deleted_files = []
-        failed_files = []
-        
-        audio_dir = f"app/static/{slug}"
-        
-        if not os.path.exists(audio_dir):
+        audio_dir = os.path.join(BASE_STATIC_DIR, slug)
+
+        if not await asyncio.to_thread(os.path.isdir, audio_dir):
             return {
                 "message": f"No audio directory found for {slug}",
                 "deleted": [],
                 "failed": []
             }
-        
-        for key in request.keys:
-            audio_file = f"{audio_dir}/{key}.mp3"
-            
-            if os.path.exists(audio_file):
-                try:
-                    os.remove(audio_file)
-                    deleted_files.append(f"{key}.mp3")
-                except Exception as e:
-                    failed_files.append({"file": f"{key}.mp3", "error": str(e)})
-            else:
-                # File doesn't exist, not an error
-                pass
-        
+
+        deleted_files, failed_files = await asyncio.to_thread(_delete_keys, slug, request.keys)
+
         return {
             "message": f"Deleted {len(deleted_files)} audio files",
             "deleted": deleted_files,
             "failed": failed_files
         }
-    
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/audio-gc")
+async def collect_audio_garbage(dry_run: bool = True,
+                                batch_size: int = DEFAULT_BATCH_SIZE,
+                                min_age_seconds: int = DEFAULT_MIN_AGE_SECONDS,
+                                include_stale: bool = False):
+    """
+    Remove audio for scripts/keys that no longer exist, and with include_stale
+    also audio whose prompt text or voice has changed since it was generated.
+    Defaults to a dry run that only reports what would be deleted.
+    """
+    if batch_size < 1 or min_age_seconds < 0:
+        raise HTTPException(status_code=400, detail="Invalid batch_size or min_age_seconds")
+
+    try:
+        return await run_gc(dry_run=dry_run, batch_size=batch_size,
+                            min_age_seconds=min_age_seconds, include_stale=include_stale)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/audio-usage")
+async def audio_disk_usage():
+    """Per-slug disk usage of app/static"""
+    try:
+        report = await run_gc(dry_run=True)
+        return {
+            "total_bytes": report["total_bytes"],
+            "reclaimable_bytes": report["reclaimable_bytes"],
+            "disk_usage": report["disk_usage"]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
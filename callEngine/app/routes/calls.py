@@ -3,6 +3,9 @@ from pydantic import BaseModel
 from typing import List, Optional
 from twilio.rest import Client
 import os
+import asyncio
+from app.utils.audio_cache import generate_prompt, is_current
+from app.utils.tts import resolve_voice
 
 router = APIRouter()
 
@@ -89,79 +92,39 @@ async def generate_audio_for_script(slug: str, request: AudioGenerationRequest):
     Generate audio files for a script
     """
     try:
-        import asyncio
-        import edge_tts
-        
-        # Comprehensive voice mapping for multiple languages
-        # Format: language_code -> {voice_type -> voice_name}
-        VOICE_MAP = {
-            "en-US": {
-                "male": "en-US-GuyNeural",
-                "female": "en-US-AriaNeural",
-                "neutral": "en-US-JennyNeural"
-            },
-            "en-GB": {
-                "male": "en-GB-RyanNeural",
-                "female": "en-GB-SoniaNeural",
-                "neutral": "en-GB-LibbyNeural"
-            },
-            "hi-IN": {
-                "male": "hi-IN-MadhurNeural",
-                "female": "hi-IN-SwaraNeural",
-                "neutral": "hi-IN-SwaraNeural"
-            },
-            "es-ES": {
-                "male": "es-ES-AlvaroNeural",
-                "female": "es-ES-ElviraNeural",
-                "neutral": "es-ES-ElviraNeural"
-            },
-            "fr-FR": {
-                "male": "fr-FR-HenriNeural",
-                "female": "fr-FR-DeniseNeural",
-                "neutral": "fr-FR-DeniseNeural"
-            },
-            "de-DE": {
-                "male": "de-DE-ConradNeural",
-                "female": "de-DE-KatjaNeural",
-                "neutral": "de-DE-KatjaNeural"
-            },
-            "ja-JP": {
-                "male": "ja-JP-KeitaNeural",
-                "female": "ja-JP-NanamiNeural",
-                "neutral": "ja-JP-NanamiNeural"
-            },
-            "zh-CN": {
-                "male": "zh-CN-YunxiNeural",
-                "female": "zh-CN-XiaoxiaoNeural",
-                "neutral": "zh-CN-XiaoxiaoNeural"
-            }
-        }
-        
-        # Get language and voice type
-        language = request.script_data.language or "en-US"
-        voice_type = request.script_data.voice_type or "female"
-        
         # Get voice from mapping, fallback to English if language not found
-        language_voices = VOICE_MAP.get(language, VOICE_MAP["en-US"])
-        voice = language_voices.get(voice_type, language_voices.get("female"))
+        voice = resolve_voice(request.script_data.language, request.script_data.voice_type)
         
-        # Create target directory
-        target_dir = f"app/static/{slug}"
-        os.makedirs(target_dir, exist_ok=True)
+        # Store the script so on-demand audio and the audio GC know about it
+        # before the first call is triggered
+        from app.database import get_database
+        db = get_database()
+        if db is not None:
+            await db["scripts"].update_one(
+                {"slug": slug},
+                {"$set": {
+                    "slug": slug,
+                    "name": request.script_data.name,
+                    "language": request.script_data.language,
+                    "voice_type": request.script_data.voice_type,
+                    "flow": [item.dict() for item in request.script_data.flow]
+                }},
+                upsert=True
+            )
         
         # Generate audio for each flow item
         for item in request.script_data.flow:
-            file_path = os.path.join(target_dir, f"{item.key}.mp3")
-            
-            # Skip if exists
-            if os.path.exists(file_path):
+            # Skip only if the cached audio was made from this text and voice;
+            # edited prompts (or files with no recorded version) are regenerated
+            if await asyncio.to_thread(is_current, slug, item.key, item.text, voice):
                 print(f"✅ Exists: {item.key}.mp3")
                 continue
             
             try:
+                # Shared with on-demand synthesis: written to a temp file and renamed,
+                # so a call placed meanwhile never plays a half-written prompt
                 print(f"🎙️ Generating: {item.key}...")
-                communicate = edge_tts.Communicate(item.text, voice)
-                await communicate.save(file_path)
+                await generate_prompt(slug, item.key, item.text, voice)
                 print(f"✅ Generated: {item.key}.mp3")
             except Exception as e:
                 print(f"❌ Error generating {item.key}: {e}")
@@ -174,3 +137,28 @@ async def generate_audio_for_script(slug: str, request: AudioGenerationRequest):
     except Exception as e:
         print(f"❌ Error generating audio: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{slug}/script")
+async def delete_script(slug: str):
+    """
+    Forget a script when its bot is deleted.
+    Its audio folder becomes orphaned and is removed by the audio GC.
+    """
+    try:
+        from app.database import get_database
+        db = get_database()
+        if db is None:
+            raise HTTPException(status_code=500, detail="Database not connected")
+
+        result = await db["scripts"].delete_one({"slug": slug})
+
+        return {
+            "success": True,
+            "deleted": result.deleted_count
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error deleting script {slug}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,10 +1,15 @@
 import os
 import json
 import glob
-from fastapi import APIRouter, Request, Response, Depends
+import asyncio
+from urllib.parse import quote
+from fastapi import APIRouter, Request, Response, Depends, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 from twilio.twiml.voice_response import VoiceResponse, Gather
 from app.conversation.store import save_answer
 from app.security import validate_twilio_request
+from app.utils.audio_cache import audio_path, is_current, is_safe_name, stream_prompt
+from app.utils.tts import SCRIPT_VOICE_MAP, resolve_voice
 
 router = APIRouter()
 BASE_URL = os.getenv("BASE_URL")
@@ -31,6 +36,68 @@ def load_scripts():
 
 load_scripts() 
 
+async def find_prompt(slug: str, key: str):
+    """Return (text, voice) for a flow item, or None if the script/key is unknown"""
+    from app.database import get_database
+    db = get_database()
+    script_data = None
+
+    if db is not None:
+        script_data = await db["scripts"].find_one({"slug": slug})
+
+    if script_data:
+        flow = script_data.get("flow", [])
+        voice = resolve_voice(script_data.get("language"), script_data.get("voice_type"))
+    else:
+        if slug not in SCRIPTS_CACHE:
+            load_scripts()
+        if slug not in SCRIPTS_CACHE:
+            return None
+        flow = SCRIPTS_CACHE[slug]["full_flow"]
+        voice = SCRIPT_VOICE_MAP.get(slug, "en-US-AriaNeural")
+
+    for item in flow:
+        if item.get("key") == key:
+            return item.get("text", ""), voice
+    return None
+
+
+@router.get("/audio/{slug}/{key}.mp3")
+async def prompt_audio(slug: str, key: str):
+    """
+    Serve a prompt's audio, synthesizing it on first use or after its text changed.
+    Concurrent misses for the same prompt share one synthesis.
+    """
+    if not is_safe_name(slug) or not is_safe_name(key):
+        raise HTTPException(status_code=400, detail="Invalid script or key")
+
+    prompt = await find_prompt(slug, key)
+    if prompt is None:
+        raise HTTPException(status_code=404, detail="Prompt not found")
+    text, voice = prompt
+
+    # Serve the cached file unless the prompt's text or voice changed since it was made
+    if await asyncio.to_thread(is_current, slug, key, text, voice, True):
+        return FileResponse(audio_path(slug, key), media_type="audio/mpeg")
+
+    # Pull the first chunk up front so a failed synthesis becomes a 502
+    # instead of an empty 200 that Twilio would play as silence
+    audio = stream_prompt(slug, key, text, voice)
+    try:
+        first_chunk = await audio.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=502, detail="No audio generated")
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Audio generation failed: {e}")
+
+    async def body():
+        yield first_chunk
+        async for chunk in audio:
+            yield chunk
+
+    return StreamingResponse(body(), media_type="audio/mpeg")
+
+
 @router.post("/start", dependencies=[Depends(validate_twilio_request)])
 async def start_call(request: Request):
     script_slug = request.query_params.get("script", "agrosathi")
@@ -183,7 +250,8 @@ async def ask_question(vr, step_index, retry, script_slug, questions_list, recog
     question_data = questions_list[step_index]
     key = question_data["key"]
     
-    audio_url = f"{BASE_URL}/static/{script_slug}/{key}.mp3"
+    # Served from the cache when current, otherwise synthesized on demand
+    audio_url = f"{BASE_URL}/voice/audio/{quote(script_slug)}/{quote(key)}.mp3"
     hint_text = question_data.get("hints", "")
 
     # 🟢 FIX: Play audio BEFORE gather. 
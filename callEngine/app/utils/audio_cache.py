@@ -0,0 +1,233 @@
+import os
+import json
+import asyncio
+import hashlib
+import tempfile
+import threading
+import aiofiles
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.utils.tts import get_tts_backend
+
+BASE_STATIC_DIR = "app/static"
+
+
+def is_safe_name(name: str) -> bool:
+    """
+    Slugs and keys end up in file paths. Bot keys are free text, so only reject
+    what could escape app/static/<slug>: separators, "..", NUL and empty names.
+    """
+    if not name or name.strip() == "":
+        return False
+    return not any(bad in name for bad in ("/", "\\", "..", "\0"))
+
+
+def audio_path(slug: str, key: str) -> str:
+    return os.path.join(BASE_STATIC_DIR, slug, f"{key}.mp3")
+
+
+# Per-slug record of the text + voice each mp3 was synthesized from
+MANIFEST_NAME = ".manifest.json"
+_manifest_lock = threading.Lock()
+
+
+def prompt_hash(text: str, voice: str) -> str:
+    return hashlib.sha256(f"{voice}\n{text}".encode("utf-8")).hexdigest()
+
+
+def read_manifest(slug: str) -> Dict[str, str]:
+    """key -> prompt_hash for a slug; empty if missing or unreadable"""
+    try:
+        with open(os.path.join(BASE_STATIC_DIR, slug, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(slug: str, manifest: Dict[str, str]):
+    """Atomic rewrite of a slug's manifest; caller holds _manifest_lock"""
+    path = os.path.join(BASE_STATIC_DIR, slug, MANIFEST_NAME)
+    tmp_path = _make_temp_file(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def forget_versions(slug: str, keys: List[str]):
+    """Drop manifest entries for keys whose audio was deleted"""
+    with _manifest_lock:
+        manifest = read_manifest(slug)
+        if not any(key in manifest for key in keys):
+            return
+        for key in keys:
+            manifest.pop(key, None)
+        _write_manifest(slug, manifest)
+
+
+def _commit_version(slug: str, key: str, version: str, tmp_path: str) -> bool:
+    """
+    Move a finished temp file into place and record its version, unless a newer
+    version of the same prompt was requested meanwhile. Returns False if superseded.
+    """
+    with _manifest_lock:
+        if _latest.get((slug, key)) != version:
+            os.remove(tmp_path)
+            return False
+        # Atomic rename so StaticFiles never serves a half-written file
+        os.replace(tmp_path, audio_path(slug, key))
+        manifest = read_manifest(slug)
+        manifest[key] = version
+        _write_manifest(slug, manifest)
+        return True
+
+
+def is_current(slug: str, key: str, text: str, voice: str, allow_unversioned: bool = False) -> bool:
+    """
+    True if the cached mp3 exists and was made from this exact text and voice.
+    allow_unversioned also accepts files generated before versions were recorded.
+    """
+    if not os.path.exists(audio_path(slug, key)):
+        return False
+    version = read_manifest(slug).get(key)
+    if version is None:
+        return allow_unversioned
+    return version == prompt_hash(text, voice)
+
+
+def _make_temp_file(path: str) -> str:
+    """Create an empty, uniquely named "<key>.mp3.<random>.part" next to path"""
+    f = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path),
+        prefix=f"{os.path.basename(path)}.",
+        suffix=".part",
+        delete=False
+    )
+    f.close()
+    return f.name
+
+
+class _Flight:
+    """A single in-progress synthesis shared by every request for the same prompt."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.cond = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+
+# (slug, key, prompt_hash) -> in-flight synthesis
+_inflight: Dict[Tuple[str, str, str], _Flight] = {}
+
+# (slug, key) -> prompt_hash of the most recently started synthesis. When the text
+# is edited while an older version is still synthesizing, only the newest is kept.
+_latest: Dict[Tuple[str, str], str] = {}
+
+
+def is_in_flight(slug: str, key: str) -> bool:
+    """True while any version of this prompt is being synthesized"""
+    return (slug, key) in _latest
+
+
+async def _produce(slug: str, key: str, text: str, voice: str, flight: _Flight):
+    """Run the TTS backend once, fanning chunks out to waiters and to disk."""
+    path = audio_path(slug, key)
+    version = prompt_hash(text, voice)
+    tmp_path = None
+    try:
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        # Unique temp name in the target dir: other workers (or generate_audio.py)
+        # may be writing the same prompt, and os.replace must stay on one filesystem
+        tmp_path = await asyncio.to_thread(_make_temp_file, path)
+        async with aiofiles.open(tmp_path, "wb") as f:
+            async for chunk in get_tts_backend().stream(text, voice):
+                if not chunk:
+                    continue
+                await f.write(chunk)
+                async with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+
+        if not flight.chunks:
+            raise RuntimeError(f"TTS returned no audio for {slug}/{key}")
+
+        committed = await asyncio.to_thread(_commit_version, slug, key, version, tmp_path)
+        tmp_path = None
+        if committed:
+            print(f"✅ Generated on demand: {slug}/{key}.mp3")
+        else:
+            print(f"↪️ Discarded {slug}/{key}.mp3: prompt changed during synthesis")
+    except Exception as e:
+        print(f"❌ Error generating {slug}/{key}: {e}")
+        if flight.chunks:
+            print(f"⚠️ Audio for {slug}/{key} truncated mid-stream after "
+                  f"{sum(len(c) for c in flight.chunks)} bytes; listeners got a partial prompt")
+        flight.error = e
+        if tmp_path:
+            try:
+                await asyncio.to_thread(os.remove, tmp_path)
+            except OSError:
+                pass
+    finally:
+        async with flight.cond:
+            flight.done = True
+            flight.cond.notify_all()
+        _inflight.pop((slug, key, version), None)
+        if _latest.get((slug, key)) == version:
+            _latest.pop((slug, key), None)
+
+
+def _join_flight(slug: str, key: str, text: str, voice: str) -> _Flight:
+    """Return the running synthesis for this exact prompt version, starting one if needed"""
+    version = prompt_hash(text, voice)
+    flight = _inflight.get((slug, key, version))
+    if flight is None:
+        flight = _Flight()
+        _inflight[(slug, key, version)] = flight
+        _latest[(slug, key)] = version
+        flight.task = asyncio.create_task(_produce(slug, key, text, voice, flight))
+    return flight
+
+
+async def stream_prompt(slug: str, key: str, text: str, voice: str) -> AsyncIterator[bytes]:
+    """
+    Stream the audio for a prompt that is not cached on disk yet.
+
+    The first caller starts a background synthesis; concurrent callers for the
+    same prompt text and voice attach to it and replay the chunks produced so far before
+    following along live. The synthesis keeps running if a caller hangs up, so
+    the file still lands on disk for the next one.
+
+    Raises the synthesis error only if it failed before any audio was produced.
+    """
+    flight = _join_flight(slug, key, text, voice)
+
+    sent = 0
+    while True:
+        async with flight.cond:
+            while sent >= len(flight.chunks) and not flight.done:
+                await flight.cond.wait()
+            pending = flight.chunks[sent:]
+            done = flight.done
+
+        for chunk in pending:
+            yield chunk
+        sent += len(pending)
+
+        if done and sent >= len(flight.chunks):
+            if flight.error is not None and sent == 0:
+                raise flight.error
+            return
+
+
+async def generate_prompt(slug: str, key: str, text: str, voice: str):
+    """
+    Synthesize a prompt to disk through the shared single-flight path,
+    joining any synthesis already running for it. Raises on failure.
+    """
+    flight = _join_flight(slug, key, text, voice)
+    # shield: a cancelled caller must not abort the synthesis other listeners share
+    await asyncio.shield(flight.task)
+    if flight.error is not None:
+        raise flight.error
@@ -0,0 +1,261 @@
+import os
+import json
+import glob
+import time
+import asyncio
+from typing import Dict, List, Set, Tuple
+from app.database import get_database
+from app.utils.audio_cache import (
+    BASE_STATIC_DIR, MANIFEST_NAME, forget_versions, is_in_flight, prompt_hash, read_manifest
+)
+from app.utils.tts import SCRIPT_VOICE_MAP, resolve_voice
+
+SCRIPTS_DIR = "app/scripts"
+
+# Don't touch anything younger than this: audio is generated before the
+# script reaches Mongo, and in-progress writes must not be collected
+DEFAULT_MIN_AGE_SECONDS = int(os.getenv("AUDIO_GC_MIN_AGE", 24 * 60 * 60))
+DEFAULT_BATCH_SIZE = 50
+
+
+def _flow_versions(flow: list, voice: str) -> Dict[str, str]:
+    """key -> prompt_hash for every flow item of a script"""
+    return {
+        item["key"]: prompt_hash(item.get("text", ""), voice)
+        for item in flow if item.get("key")
+    }
+
+
+def _load_json_scripts() -> Dict[str, Dict[str, str]]:
+    live = {}
+    for file in glob.glob(f"{SCRIPTS_DIR}/*.json"):
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            slug = data.get("slug")
+            if slug:
+                voice = SCRIPT_VOICE_MAP.get(slug, "en-US-AriaNeural")
+                live[slug] = _flow_versions(data.get("flow", []), voice)
+        except Exception as e:
+            print(f"❌ Error loading {file}: {e}")
+    return live
+
+
+async def collect_live_keys() -> Tuple[Dict[str, Dict[str, str]], bool]:
+    """
+    Map every known script slug to {key: prompt_hash} (Mongo + JSON scripts).
+    Mongo wins for slugs present in both, matching how calls resolve scripts.
+    Returns (live, mongo_available).
+    """
+    live = await asyncio.to_thread(_load_json_scripts)
+
+    db = get_database()
+    if db is None:
+        return live, False
+
+    try:
+        cursor = db["scripts"].find(
+            {}, {"slug": 1, "language": 1, "voice_type": 1, "flow.key": 1, "flow.text": 1}
+        )
+        async for script in cursor:
+            slug = script.get("slug")
+            if slug:
+                voice = resolve_voice(script.get("language"), script.get("voice_type"))
+                live[slug] = _flow_versions(script.get("flow", []), voice)
+    except Exception as e:
+        print(f"❌ Error reading scripts from Mongo: {e}")
+        return live, False
+
+    return live, True
+
+
+def _key_for_file(name: str):
+    """
+    Prompt key for "<key>.mp3" or a leftover "<key>.mp3.<random>.part".
+    Keys are free text and may contain dots, so never split on the first one.
+    """
+    if name.endswith(".mp3"):
+        return name[:-len(".mp3")]
+    if ".mp3." in name:
+        return name.rsplit(".mp3.", 1)[0]
+    return None
+
+
+def _scan_static() -> Dict[str, Dict[str, Tuple[int, float]]]:
+    """slug -> {filename: (size, mtime)} for every folder under app/static"""
+    usage = {}
+    if not os.path.isdir(BASE_STATIC_DIR):
+        return usage
+
+    with os.scandir(BASE_STATIC_DIR) as slugs:
+        for slug_entry in slugs:
+            if not slug_entry.is_dir():
+                continue
+            files = {}
+            with os.scandir(slug_entry.path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_size, stat.st_mtime)
+            usage[slug_entry.name] = files
+    return usage
+
+
+async def plan_gc(min_age_seconds: int = DEFAULT_MIN_AGE_SECONDS,
+                  include_stale: bool = False) -> dict:
+    """
+    Compare app/static against the known scripts and work out what can go.
+
+    - orphaned_slugs: folders whose slug is in neither Mongo nor the JSON scripts
+      (only reported when Mongo is reachable, otherwise every dynamic bot would look orphaned)
+    - orphaned_keys: mp3s whose key was removed from a live script
+    - stale_versions: mp3s whose recorded text/voice hash no longer matches the script
+      (only deleted with include_stale; files with no recorded version are left alone)
+    - leftover_files: partial writes and other non-mp3 artifacts
+    """
+    live, mongo_available = await collect_live_keys()
+    usage = await asyncio.to_thread(_scan_static)
+    cutoff = time.time() - min_age_seconds
+
+    orphaned_slugs = []
+    orphaned_keys = {}
+    stale_versions = {}
+    leftover_files = {}
+    disk_usage = {}
+    to_delete = []
+
+    for slug, files in sorted(usage.items()):
+        slug_bytes = sum(size for size, _ in files.values())
+        reclaimable = 0
+        known = slug in live
+
+        if not known and mongo_available and all(mtime < cutoff for _, mtime in files.values()):
+            orphaned_slugs.append(slug)
+            reclaimable = slug_bytes
+            to_delete.extend(os.path.join(BASE_STATIC_DIR, slug, name) for name in files)
+
+        elif known:
+            manifest = await asyncio.to_thread(read_manifest, slug)
+
+            for name, (size, mtime) in sorted(files.items()):
+                if name == MANIFEST_NAME or mtime >= cutoff:
+                    continue
+                key = _key_for_file(name)
+                if key is not None and is_in_flight(slug, key):
+                    continue
+
+                if not name.endswith(".mp3"):
+                    leftover_files.setdefault(slug, []).append(name)
+                elif key not in live[slug]:
+                    orphaned_keys.setdefault(slug, []).append(name)
+                elif key in manifest and manifest[key] != live[slug][key]:
+                    stale_versions.setdefault(slug, []).append(name)
+                    if not include_stale:
+                        continue
+                else:
+                    continue
+
+                reclaimable += size
+                to_delete.append(os.path.join(BASE_STATIC_DIR, slug, name))
+
+        disk_usage[slug] = {
+            "files": len(files),
+            "bytes": slug_bytes,
+            "reclaimable_bytes": reclaimable,
+            "known": known
+        }
+
+    return {
+        "mongo_available": mongo_available,
+        "orphaned_slugs": orphaned_slugs,
+        "orphaned_keys": orphaned_keys,
+        "stale_versions": stale_versions,
+        "leftover_files": leftover_files,
+        "disk_usage": disk_usage,
+        "total_bytes": sum(u["bytes"] for u in disk_usage.values()),
+        "reclaimable_bytes": sum(u["reclaimable_bytes"] for u in disk_usage.values()),
+        "to_delete": to_delete
+    }
+
+
+def _delete_batch(paths: List[str]) -> Tuple[List[str], List[dict]]:
+    deleted = []
+    failed = []
+    removed_keys = {}
+    for path in paths:
+        try:
+            os.remove(path)
+            deleted.append(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            failed.append({"file": path, "error": str(e)})
+            continue
+
+        name = os.path.basename(path)
+        if name.endswith(".mp3"):
+            slug = os.path.basename(os.path.dirname(path))
+            removed_keys.setdefault(slug, []).append(_key_for_file(name))
+
+    # Keep the manifest in step with what is on disk
+    for slug, keys in removed_keys.items():
+        forget_versions(slug, keys)
+
+    return deleted, failed
+
+
+def _remove_empty_dirs(slugs: List[str]):
+    for slug in slugs:
+        try:
+            os.rmdir(os.path.join(BASE_STATIC_DIR, slug))
+        except OSError:
+            # Not empty (new audio arrived) or already gone
+            pass
+
+
+async def run_gc(dry_run: bool = True,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 min_age_seconds: int = DEFAULT_MIN_AGE_SECONDS,
+                 include_stale: bool = False) -> dict:
+    """
+    Plan and (unless dry_run) delete orphaned audio in batches on a worker
+    thread, yielding to the event loop between batches.
+    """
+    report = await plan_gc(min_age_seconds, include_stale)
+    to_delete = report.pop("to_delete")
+    report["dry_run"] = dry_run
+    report["deleted"] = []
+    report["failed"] = []
+
+    if dry_run:
+        report["would_delete"] = to_delete
+        return report
+
+    for i in range(0, len(to_delete), batch_size):
+        deleted, failed = await asyncio.to_thread(_delete_batch, to_delete[i:i + batch_size])
+        report["deleted"].extend(deleted)
+        report["failed"].extend(failed)
+        await asyncio.sleep(0)
+
+    await asyncio.to_thread(_remove_empty_dirs, report["orphaned_slugs"])
+
+    print(f"🧹 Audio GC removed {len(report['deleted'])} files "
+          f"({report['reclaimable_bytes']} bytes reclaimable)")
+    return report
+
+
+async def audio_gc_loop(interval_seconds: int, delete: bool = False):
+    """
+    Background task started from the app lifespan.
+    Only logs what it would remove unless delete is set (AUDIO_GC_DELETE=true).
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            report = await run_gc(dry_run=not delete)
+            if not delete:
+                print(f"🧹 Audio GC dry run: {len(report['would_delete'])} files "
+                      f"({report['reclaimable_bytes']} bytes) could be removed, "
+                      f"orphaned slugs: {report['orphaned_slugs']}")
+        except Exception as e:
+            print(f"❌ Audio GC failed: {e}")
@@ -0,0 +1,110 @@
+import os
+import asyncio
+from typing import AsyncIterator
+
+# Comprehensive voice mapping for multiple languages
+# Format: language_code -> {voice_type -> voice_name}
+VOICE_MAP = {
+    "en-US": {
+        "male": "en-US-GuyNeural",
+        "female": "en-US-AriaNeural",
+        "neutral": "en-US-JennyNeural"
+    },
+    "en-GB": {
+        "male": "en-GB-RyanNeural",
+        "female": "en-GB-SoniaNeural",
+        "neutral": "en-GB-LibbyNeural"
+    },
+    "hi-IN": {
+        "male": "hi-IN-MadhurNeural",
+        "female": "hi-IN-SwaraNeural",
+        "neutral": "hi-IN-SwaraNeural"
+    },
+    "es-ES": {
+        "male": "es-ES-AlvaroNeural",
+        "female": "es-ES-ElviraNeural",
+        "neutral": "es-ES-ElviraNeural"
+    },
+    "fr-FR": {
+        "male": "fr-FR-HenriNeural",
+        "female": "fr-FR-DeniseNeural",
+        "neutral": "fr-FR-DeniseNeural"
+    },
+    "de-DE": {
+        "male": "de-DE-ConradNeural",
+        "female": "de-DE-KatjaNeural",
+        "neutral": "de-DE-KatjaNeural"
+    },
+    "ja-JP": {
+        "male": "ja-JP-KeitaNeural",
+        "female": "ja-JP-NanamiNeural",
+        "neutral": "ja-JP-NanamiNeural"
+    },
+    "zh-CN": {
+        "male": "zh-CN-YunxiNeural",
+        "female": "zh-CN-XiaoxiaoNeural",
+        "neutral": "zh-CN-XiaoxiaoNeural"
+    }
+}
+
+# Voices for the bundled JSON scripts (same as generate_audio.py)
+SCRIPT_VOICE_MAP = {
+    "agrosathi": "hi-IN-SwaraNeural",
+    "projectmanager": "en-US-AriaNeural"
+}
+
+
+def resolve_voice(language: str = None, voice_type: str = None) -> str:
+    """Pick an edge-tts voice, falling back to English / female."""
+    language_voices = VOICE_MAP.get(language or "en-US", VOICE_MAP["en-US"])
+    return language_voices.get(voice_type or "female", language_voices.get("female"))
+
+
+class EdgeTTSBackend:
+    """Synthesizes speech with edge-tts, yielding MP3 chunks as they arrive."""
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        import edge_tts
+
+        communicate = edge_tts.Communicate(text, voice)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+
+class FakeTTSBackend:
+    """
+    Local backend for tests and offline development.
+
+    Yields deterministic bytes without touching the network and counts how
+    many syntheses were requested, so deduplication can be asserted.
+    """
+
+    def __init__(self, chunks: int = 4):
+        self.chunks = chunks
+        self.calls = 0
+
+    async def stream(self, text: str, voice: str) -> AsyncIterator[bytes]:
+        self.calls += 1
+        payload = f"{voice}:{text}".encode("utf-8")
+        for i in range(self.chunks):
+            await asyncio.sleep(0)
+            yield payload if i == 0 else b"\x00" * 16
+
+
+_backend = None
+
+
+def get_tts_backend():
+    """Return the configured backend (TTS_BACKEND=edge|fake, default edge)."""
+    global _backend
+    if _backend is None:
+        name = os.getenv("TTS_BACKEND", "edge").lower()
+        _backend = FakeTTSBackend() if name == "fake" else EdgeTTSBackend()
+    return _backend
+
+
+def set_tts_backend(backend):
+    """Override the backend, e.g. with a FakeTTSBackend in tests."""
+    global _backend
+    _backend = backend
@@ -1,14 +1,10 @@
 import os
 import json
 import asyncio
-import edge_tts
 import glob
 
-# For English bot, use English voice
-VOICE_MAP = {
-    "agrosathi": "hi-IN-SwaraNeural",  # Hindi voice
-    "projectmanager": "en-US-AriaNeural"  # English voice
-}
+from app.utils.audio_cache import generate_prompt, is_current
+from app.utils.tts import SCRIPT_VOICE_MAP
 
 BASE_STATIC_DIR = "app/static"
 SCRIPTS_DIR = "app/scripts"
@@ -35,7 +31,7 @@ async def generate_mp3s():
             continue
 
         # Select appropriate voice based on script slug
-        voice = VOICE_MAP.get(slug, "en-US-AriaNeural")
+        voice = SCRIPT_VOICE_MAP.get(slug, "en-US-AriaNeural")
         print(f"   ↳ Using voice: {voice}")
 
         # Dynamic Folder Creation: app/static/agrosathi
@@ -46,17 +42,14 @@ async def generate_mp3s():
         for item in flow:
             key = item["key"]
             text = item["text"]
-            file_path = os.path.join(target_dir, f"{key}.mp3")
-            
-            # Check if file exists to save time (optional)
-            if os.path.exists(file_path):
+            # Skip if the file exists and was made from this text and voice
+            if is_current(slug, key, text, voice):
                  print(f"     ✅ Exists: {key}.mp3")
                  continue
 
             try:
                 print(f"     🎙️ Generating: {key}...")
-                communicate = edge_tts.Communicate(text, voice)
-                await communicate.save(file_path)
+                await generate_prompt(slug, key, text, voice)
             except Exception as e:
                 print(f"     ❌ Error generating {key}: {e}")
 
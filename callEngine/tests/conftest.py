@@ -0,0 +1,28 @@
+import os
+import sys
+import pytest
+
+# Run from callEngine/ like the app does (imports as "app.*")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TWILIO_AUTH_TOKEN", "test-token")
+os.environ.setdefault("ENV", "development")
+
+from app.utils import audio_cache, tts
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    """Point the relative app/static paths at an empty temp tree"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("app/static")
+    yield tmp_path / "app" / "static"
+    audio_cache._inflight.clear()
+    audio_cache._latest.clear()
+
+
+@pytest.fixture
+def fake_tts():
+    fake = tts.FakeTTSBackend()
+    tts.set_tts_backend(fake)
+    yield fake
+    tts.set_tts_backend(None)
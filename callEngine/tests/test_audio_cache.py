@@ -0,0 +1,105 @@
+import os
+import json
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.utils import audio_cache, tts
+from app.utils.audio_cache import generate_prompt, is_current, prompt_hash, stream_prompt
+from app.routes import voice
+
+
+class FailingBackend:
+    """Yields `chunks` chunks, then raises"""
+
+    def __init__(self, chunks: int = 0):
+        self.chunks = chunks
+
+    async def stream(self, text, voice):
+        for _ in range(self.chunks):
+            await asyncio.sleep(0)
+            yield b"partial"
+        raise IOError("tts unavailable")
+
+
+async def _consume(slug, key, text, voice):
+    return b"".join([chunk async for chunk in stream_prompt(slug, key, text, voice)])
+
+
+def test_concurrent_misses_share_one_synthesis(static_dir, fake_tts):
+    async def run():
+        return await asyncio.gather(*[_consume("s1", "q.1", "Hello", "v") for _ in range(50)])
+
+    results = asyncio.run(run())
+
+    assert fake_tts.calls == 1
+    assert len(set(results)) == 1
+    assert (static_dir / "s1" / "q.1.mp3").read_bytes() == results[0]
+    manifest = json.loads((static_dir / "s1" / audio_cache.MANIFEST_NAME).read_text())
+    assert manifest == {"q.1": prompt_hash("Hello", "v")}
+
+
+def test_edited_text_replaces_in_flight_old_version(static_dir, fake_tts):
+    async def run():
+        old = asyncio.create_task(generate_prompt("s1", "k1", "OLD TEXT", "v"))
+        await asyncio.sleep(0)
+        await generate_prompt("s1", "k1", "NEW TEXT", "v")
+        await old
+
+    asyncio.run(run())
+
+    assert fake_tts.calls == 2
+    assert is_current("s1", "k1", "NEW TEXT", "v")
+    assert b"NEW TEXT" in (static_dir / "s1" / "k1.mp3").read_bytes()
+
+
+def test_failure_mid_stream_removes_part_file(static_dir):
+    tts.set_tts_backend(FailingBackend(chunks=2))
+    try:
+        with pytest.raises(IOError):
+            asyncio.run(generate_prompt("s1", "k1", "Hello", "v"))
+    finally:
+        tts.set_tts_backend(None)
+
+    assert os.listdir(static_dir / "s1") == []
+
+
+def test_prompt_audio_returns_502_when_synthesis_fails(static_dir, monkeypatch):
+    async def find_prompt(slug, key):
+        return "Hello", "v"
+
+    monkeypatch.setattr(voice, "find_prompt", find_prompt)
+    tts.set_tts_backend(FailingBackend(chunks=0))
+    app = FastAPI()
+    app.include_router(voice.router, prefix="/voice")
+    try:
+        response = TestClient(app).get("/voice/audio/s1/q.1.mp3")
+    finally:
+        tts.set_tts_backend(None)
+
+    assert response.status_code == 502
+
+
+def test_prompt_audio_regenerates_stale_cache(static_dir, fake_tts, monkeypatch):
+    asyncio.run(generate_prompt("s1", "k1", "OLD TEXT", "v"))
+
+    async def find_prompt(slug, key):
+        return "NEW TEXT", "v"
+
+    monkeypatch.setattr(voice, "find_prompt", find_prompt)
+    app = FastAPI()
+    app.include_router(voice.router, prefix="/voice")
+    response = TestClient(app).get("/voice/audio/s1/k1.mp3")
+
+    assert response.status_code == 200
+    assert b"NEW TEXT" in response.content
+
+
+@pytest.mark.parametrize("name", ["", " ", "..", "a/b", "a\\b", "../etc"])
+def test_unsafe_names_rejected(name):
+    assert not audio_cache.is_safe_name(name)
+
+
+@pytest.mark.parametrize("name", ["q.1", "how are you", "how_was_your_day_"])
+def test_free_text_keys_accepted(name):
+    assert audio_cache.is_safe_name(name)
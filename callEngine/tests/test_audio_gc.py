@@ -0,0 +1,59 @@
+import json
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.utils import audio_gc
+from app.utils.audio_cache import generate_prompt, read_manifest
+from app.routes import audio_management
+
+VOICE = "en-US-AriaNeural"
+
+
+def _write_script(static_dir, flow):
+    scripts = static_dir.parent / "scripts"
+    scripts.mkdir(exist_ok=True)
+    (scripts / "live.json").write_text(json.dumps({"slug": "live", "flow": flow}))
+
+
+def test_keys_with_dots_are_not_orphaned(static_dir, fake_tts, monkeypatch):
+    monkeypatch.setattr(audio_gc, "get_database", lambda: None)
+    _write_script(static_dir, [{"key": "q.1", "text": "Hello", "is_question": True}])
+    asyncio.run(generate_prompt("live", "q.1", "Hello", VOICE))
+    asyncio.run(generate_prompt("live", "q", "Removed", VOICE))
+    (static_dir / "live" / "q.1.mp3.abc123.part").write_bytes(b"x")
+
+    report = asyncio.run(audio_gc.run_gc(dry_run=False, min_age_seconds=0))
+
+    assert report["orphaned_keys"] == {"live": ["q.mp3"]}
+    assert report["leftover_files"] == {"live": ["q.1.mp3.abc123.part"]}
+    assert (static_dir / "live" / "q.1.mp3").exists()
+    assert not (static_dir / "live" / "q.mp3").exists()
+    assert set(read_manifest("live")) == {"q.1"}
+
+
+def test_stale_versions_deleted_only_when_requested(static_dir, fake_tts, monkeypatch):
+    monkeypatch.setattr(audio_gc, "get_database", lambda: None)
+    _write_script(static_dir, [{"key": "intro", "text": "New text", "is_question": False}])
+    asyncio.run(generate_prompt("live", "intro", "Old text", VOICE))
+
+    report = asyncio.run(audio_gc.run_gc(dry_run=False, min_age_seconds=0))
+    assert report["stale_versions"] == {"live": ["intro.mp3"]}
+    assert (static_dir / "live" / "intro.mp3").exists()
+
+    asyncio.run(audio_gc.run_gc(dry_run=False, min_age_seconds=0, include_stale=True))
+    assert not (static_dir / "live" / "intro.mp3").exists()
+    assert read_manifest("live") == {}
+
+
+def test_delete_audio_accepts_free_text_keys(static_dir, fake_tts):
+    asyncio.run(generate_prompt("bot", "how are you.", "Hi", VOICE))
+    app = FastAPI()
+    app.include_router(audio_management.router, prefix="/calls")
+    client = TestClient(app)
+
+    response = client.post("/calls/bot/delete-audio", json={"keys": ["how are you.", "../x"]})
+
+    body = response.json()
+    assert body["deleted"] == ["how are you..mp3"]
+    assert body["failed"] == [{"file": "../x.mp3", "error": "Invalid key"}]
+    assert read_manifest("bot") == {}
@@ -166,6 +166,19 @@ exports.deleteBot = async (req, res, next) => {
       });
     }
 
+    // Drop the call engine's copy of the script so its audio gets garbage collected
+    if (bot.slug) {
+      try {
+        const axios = require('axios');
+        const CALLENGINE_URL = process.env.CALLENGINE_URL;
+
+        await axios.delete(`${CALLENGINE_URL}/calls/${bot.slug}/script`);
+      } catch (error) {
+        console.error('Error removing script from call engine:', error.message);
+        // Continue with deletion even if the call engine is unreachable
+      }
+    }
+
     await bot.deleteOne();
 
     res.status(HTTP_STATUS.OK).json({